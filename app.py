@@ -4,9 +4,11 @@ Built with Streamlit for client demonstrations
 """
 
 import streamlit as st
+import io
 import json
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from src.engine.extractor import ShipmentExtractor
+from src.storage.result_store import ResultStore
 from src.config import settings
 import pandas as pd
 
@@ -61,9 +63,16 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Persistent result store (shared with main.py)
+@st.cache_resource
+def get_store() -> ResultStore:
+    return ResultStore(settings.RESULT_DB_PATH)
+
+store = get_store()
+
 # Initialize session state
-if 'extraction_history' not in st.session_state:
-    st.session_state.extraction_history = []
+if 'history_cursors' not in st.session_state:
+    st.session_state.history_cursors = [None]
 
 # Sidebar
 with st.sidebar:
@@ -78,7 +87,7 @@ with st.sidebar:
     st.markdown("### 📊 System Stats")
     st.metric("Accuracy", "93%+", "5% vs v5")
     st.metric("Avg Processing", "< 1s", "per email")
-    st.metric("Sessions", len(st.session_state.extraction_history))
+    st.metric("Stored Results", f"{store.count():,}")
 
 # Main Content
 st.markdown('<h1 class="main-header">📦 AI Shipment Extraction System</h1>', unsafe_allow_html=True)
@@ -152,11 +161,7 @@ Thanks!""",
                     result = extractor.process_item(email_content)
                     
                     # Add to history
-                    st.session_state.extraction_history.append({
-                        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                        'email': email_content,
-                        'result': result.model_dump()
-                    })
+                    store.add(result.model_dump(), email_content, source="app")
                     
                     # Display results
                     st.success("✅ Extraction Complete!")
@@ -262,36 +267,89 @@ Thanks"""
 
 with tab3:
     st.markdown("### 📈 Extraction History")
-    
-    if st.session_state.extraction_history:
-        # Create DataFrame
+
+    fcol1, fcol2, fcol3, fcol4, fcol5 = st.columns(5)
+    with fcol1:
+        f_port = st.text_input("Port Code", placeholder="e.g. INMAA", help="Matches origin or destination").strip()
+    with fcol2:
+        f_product = st.selectbox("Product Line", ["All", "pl_sea_import_lcl", "pl_sea_export_lcl"])
+    with fcol3:
+        f_dg = st.selectbox("Dangerous Goods", ["All", "DG only", "Non-DG"])
+    with fcol4:
+        f_days = st.selectbox("Period", ["All time", "Last 24 hours", "Last 7 days", "Last 30 days"])
+    with fcol5:
+        page_size = st.selectbox("Rows per page", [25, 50, 100, 250], index=1)
+
+    days = {"Last 24 hours": 1, "Last 7 days": 7, "Last 30 days": 30}.get(f_days)
+    filters = dict(
+        port=f_port or None,
+        product_line=None if f_product == "All" else f_product,
+        is_dangerous={"DG only": True, "Non-DG": False}.get(f_dg),
+        since=(datetime.now(timezone.utc) - timedelta(days=days)).strftime('%Y-%m-%d %H:%M:%S') if days else None
+    )
+
+    # Reset paging whenever the filters change. Keyed on the widget values, not the
+    # computed `since`, which moves forward on every rerun
+    filter_key = json.dumps([f_port, f_product, f_dg, f_days, page_size])
+    if st.session_state.get('history_filter_key') != filter_key:
+        st.session_state.history_filter_key = filter_key
+        st.session_state.history_cursors = [None]
+        st.session_state.history_export = None
+
+    total = store.count(**filters)
+    if total:
+        # Keyset pagination: each cursor is the smallest row id of the previous page
+        cursors = st.session_state.history_cursors
+        rows = store.query(limit=page_size, before_id=cursors[-1], **filters)
+
         history_data = []
-        for entry in reversed(st.session_state.extraction_history):
-            result = entry['result']
+        for row in rows:
             history_data.append({
-                'Timestamp': entry['timestamp'],
-                'Origin': result.get('origin_port_code', 'N/A'),
-                'Destination': result.get('destination_port_code', 'N/A'),
-                'Product Line': result.get('product_line', 'N/A'),
-                'Weight (kg)': result.get('cargo_weight_kg', 'N/A'),
-                'Volume (CBM)': result.get('cargo_cbm', 'N/A'),
-                'DG': '⚠️' if result.get('is_dangerous') else '✅'
+                'Timestamp (UTC)': row['created_at'],
+                'Email ID': row['email_id'],
+                'Origin': row['origin_port_code'] or 'N/A',
+                'Destination': row['destination_port_code'] or 'N/A',
+                'Product Line': row['product_line'] or 'N/A',
+                'Weight (kg)': row['cargo_weight_kg'] if row['cargo_weight_kg'] is not None else 'N/A',
+                'Volume (CBM)': row['cargo_cbm'] if row['cargo_cbm'] is not None else 'N/A',
+                'DG': '⚠️' if row['is_dangerous'] else '✅'
             })
-        
+
         df = pd.DataFrame(history_data)
         st.dataframe(df, use_container_width=True)
-        
-        # Download button
-        csv = df.to_csv(index=False).encode('utf-8')
-        st.download_button(
-            label="📥 Download History as CSV",
-            data=csv,
-            file_name=f'extraction_history_{datetime.now().strftime("%Y%m%d")}.csv',
-            mime='text/csv'
-        )
-        
-        if st.button("🗑️ Clear History"):
-            st.session_state.extraction_history = []
+
+        page_no = len(cursors)
+        total_pages = (total + page_size - 1) // page_size
+        pcol1, pcol2, pcol3 = st.columns([1, 2, 1])
+        with pcol1:
+            if st.button("⬅️ Newer", disabled=page_no == 1):
+                if len(cursors) > 1:
+                    cursors.pop()
+                st.rerun()
+        with pcol2:
+            st.markdown(f"Page **{page_no}** of **{total_pages}** · {total:,} matching results")
+        with pcol3:
+            if st.button("Older ➡️", disabled=page_no >= total_pages or not rows):
+                cursors.append(rows[-1]['id'])
+                st.rerun()
+
+        # Download button (all matching rows, streamed from the store)
+        if st.button("📦 Prepare CSV Export"):
+            buffer = io.StringIO()
+            store.export(buffer, "csv", **filters)
+            st.session_state.history_export = buffer.getvalue().encode('utf-8')
+        if st.session_state.get('history_export'):
+            st.download_button(
+                label="📥 Download History as CSV",
+                data=st.session_state.history_export,
+                file_name=f'extraction_history_{datetime.now().strftime("%Y%m%d")}.csv',
+                mime='text/csv'
+            )
+
+        if st.button("🗑️ Clear Demo History"):
+            store.clear(source="app")
+            st.session_state.history_cursors = [None]
+            st.session_state.history_export = None
             st.rerun()
     else:
         st.info("No extraction history yet. Process some emails to see results here!")
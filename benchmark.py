@@ -0,0 +1,125 @@
+"""
+Per-request overhead benchmark across LLM backends.
+
+Runs the same small chat completion through each backend with N worker threads
+and reports latency percentiles and throughput. Without --base-url a local
+mock server (zero model time) is started, so the numbers are pure client,
+connection and HTTP overhead.
+
+    python benchmark.py --requests 200 --workers 8
+    python benchmark.py --base-url http://gpu-box:8000/v1 --backends openai openai-nokeepalive
+    python benchmark.py --stream --token-delay 0.01    # streaming + early cut-off vs full completions
+"""
+
+import time
+import argparse
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict
+from src.config import settings
+from src.engine.backends import BACKENDS, LLMBackend, OpenAICompatibleBackend
+from src.engine.extractor import ShipmentExtractor
+
+MESSAGES = [
+    {"role": "system", "content": "Return ONLY JSON."},
+    {"role": "user", "content": "Subject: Shanghai to Chennai\nBody: 1500 kgs, 5.2 CBM, CIF."}
+]
+
+
+def build_backend(name: str, base_url: str, workers: int) -> LLMBackend:
+    if name == "openai-nokeepalive":
+        # Same client, but a fresh TCP connection per request: shows what pooling saves
+        return OpenAICompatibleBackend(base_url=base_url, pool_size=workers, keep_alive=False)
+    if name == "openai":
+        return OpenAICompatibleBackend(base_url=base_url, pool_size=workers)
+    return BACKENDS[name](pool_size=workers)
+
+
+def run(backend: LLMBackend, requests: int, workers: int) -> Dict[str, float]:
+    def one(_):
+        start = time.perf_counter()
+        backend.complete(settings.MODEL_NAME, MESSAGES, temperature=0, json_mode=True)
+        return time.perf_counter() - start
+
+    backend.complete(settings.MODEL_NAME, MESSAGES)  # warm-up (DNS, TLS, first connection)
+    wall = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        latencies: List[float] = sorted(pool.map(one, range(requests)))
+    wall = time.perf_counter() - wall
+    return {
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000,
+        "req_per_s": requests / wall
+    }
+
+
+def run_streaming(backend: LLMBackend, requests: int, workers: int) -> Dict[str, float]:
+    """Same extraction through the full-completion and streaming paths of the ShipmentExtractor."""
+    extractor = ShipmentExtractor(backend=backend)
+    content = MESSAGES[1]["content"]
+    for streaming in (False, True):
+        extractor.streaming = streaming
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(lambda _: extractor.extract_from_content(content, retries=1), range(requests)))
+    return extractor.stream_report()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-request overhead across LLM backends")
+    parser.add_argument("--backends", nargs="+", default=["openai", "openai-nokeepalive"],
+                        help=f"Backends to compare: {', '.join(sorted(BACKENDS))}, openai-nokeepalive")
+    parser.add_argument("--base-url", default=None, help="OpenAI-compatible server (default: start local mock server)")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=settings.WORKERS)
+    parser.add_argument("--stream", action="store_true", help="Compare streaming (early cut-off) against full completions")
+    parser.add_argument("--token-delay", type=float, default=0.005, help="Mock server generation time per token (with --stream)")
+    args = parser.parse_args()
+
+    base_url = args.base_url
+    server = None
+    if base_url is None:
+        from mock_llm_server import start_server
+        server = start_server(token_delay=args.token_delay if args.stream else 0.0)
+        base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+        print(f"Using local mock server at {base_url}")
+
+    if args.stream:
+        print(f"\n{'Backend':<22}{'full ms':>10}{'stream ms':>11}{'1st field ms':>14}{'saved ms':>10}{'cut off':>9}")
+        print("-" * 76)
+        for name in args.backends:
+            backend = build_backend(name, base_url, args.workers)
+            try:
+                r = run_streaming(backend, args.requests, args.workers)
+                ms = lambda key: f"{r[key] * 1000:.1f}" if key in r else "n/a"
+                print(f"{name:<22}{ms('full_total_avg'):>10}{ms('stream_total_avg'):>11}"
+                      f"{ms('stream_first_field_avg'):>14}{ms('saved_avg'):>10}"
+                      f"{r.get('stream_cut_off', 0):>5}/{r.get('stream_calls', 0):<3}")
+                if "full_total_avg" not in r or "stream_total_avg" not in r:
+                    print(f"{'':<22}(every call in one mode failed; see warnings above)")
+            except Exception as e:
+                print(f"{name:<22} failed: {e}")
+            finally:
+                backend.close()
+        if server:
+            server.shutdown()
+        return
+
+    print(f"\n{'Backend':<22}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'req/s':>10}")
+    print("-" * 62)
+    for name in args.backends:
+        backend = build_backend(name, base_url, args.workers)
+        try:
+            stats = run(backend, args.requests, args.workers)
+            print(f"{name:<22}{stats['mean_ms']:>10.2f}{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}{stats['req_per_s']:>10.1f}")
+        except Exception as e:
+            print(f"{name:<22} failed: {e}")
+        finally:
+            backend.close()
+
+    if server:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,52 @@
 import os
-import json
+import sys
+import time
 import argparse
+import threading
+import uuid
+from collections import deque
+from datetime import datetime
 from loguru import logger
 from src.config import settings
 from src.engine.extractor import ShipmentExtractor
+from src.engine.backends import get_backend
+from src.engine.scheduler import PriorityScheduler, PriorityRules
+from src.storage.result_store import ResultStore
+from src.profiling import tracer
 from src.connectors.json_connector import JSONConnector
 from src.connectors.email_connector import EmailConnector
 
+SEEN_IDS_WINDOW = 10_000
+
 def main():
     parser = argparse.ArgumentParser(description="Shipment Extraction System - AI Engineering Demo")
     parser.add_argument("--source", choices=["json", "email"], default="json", help="Data source: 'json' for batch/dummy data, 'email' for live IMAP fetch (requires .env config)")
     parser.add_argument("--limit", type=int, default=10, help="Number of emails to fetch (if source is email)")
+    parser.add_argument("--workers", type=int, default=settings.WORKERS, help="Number of concurrent extraction workers")
+    parser.add_argument("--follow", action="store_true", help="Keep polling the source for new emails until interrupted (Ctrl+C)")
+    parser.add_argument("--stream", action=argparse.BooleanOptionalAction, default=settings.LLM_STREAMING, help="Stream completions and stop as soon as a complete, valid JSON object arrives (default: LLM_STREAMING)")
+    parser.add_argument("--poll-interval", type=float, default=settings.POLL_INTERVAL, help="Seconds between source polls in follow mode")
+    parser.add_argument("--profile", nargs="?", const="outputs/profile_trace.json", default=None, metavar="PATH", help="Record per-email trace spans to a Chrome-trace/Perfetto JSON file (default: outputs/profile_trace.json)")
+    parser.add_argument("--profile-cpu", action="store_true", help="With --profile: also run cProfile and report the hottest call sites")
+    parser.add_argument("--profile-memory", action="store_true", help="With --profile: also track allocations with tracemalloc")
     args = parser.parse_args()
 
+    if args.profile:
+        tracer.enable(cpu=args.profile_cpu, memory=args.profile_memory)
+        if args.profile_cpu and args.workers > 1 and sys.version_info >= (3, 12):
+            logger.warning("On Python 3.12+ cProfile keeps one call stack for all threads; with several workers, call counts and per-function times are approximate. Use --workers 1 for exact CPU stats.")
+
     logger.info("Initializing Shipment Extraction System Pipeline...")
-    
-    # 1. Initialize Engine
-    extractor = ShipmentExtractor()
-    
+
+    # 1. Initialize Engine (backend connection pool is sized to the worker count)
+    extractor = ShipmentExtractor(backend=get_backend(pool_size=max(1, args.workers)))
+    extractor.streaming = args.stream
+
     # 2. Setup Connector based on source
     if args.source == "email":
         if not all([settings.EMAIL_HOST, settings.EMAIL_USER, settings.EMAIL_PASS]):
             logger.error("Missing Email Configuration in .env. Falling back to JSON source.")
+            args.source = "json"
             connector = JSONConnector(settings.INPUT_PATH)
         else:
             connector = EmailConnector(
@@ -35,29 +60,106 @@ def main():
         connector = JSONConnector(settings.INPUT_PATH)
         logger.info(f"Source set to BATCH JSON ({settings.INPUT_PATH})")
 
-    # 3. Data Ingestion
-    emails = connector.fetch_emails() if args.source == "json" else connector.fetch_emails(limit=args.limit)
-    
-    if not emails:
+    def fetch():
+        with tracer.span("connector_fetch", source=args.source):
+            return connector.fetch_emails() if args.source == "json" else connector.fetch_emails(limit=args.limit)
+
+    # 3. Scheduler (urgent enquiries jump the queue)
+    scheduler = PriorityScheduler(PriorityRules(
+        urgent_senders=settings.URGENT_SENDERS,
+        high_senders=settings.HIGH_PRIORITY_SENDERS,
+        escalate_after=settings.ESCALATE_AFTER
+    ))
+    # Ids already queued, bounded so long --follow runs keep constant memory. The
+    # window never drops below one fetch, so a re-fetched batch is not queued twice.
+    seen_ids = set()
+    seen_order = deque()
+    total_queued = 0
+
+    def enqueue_new(emails) -> int:
+        nonlocal total_queued
+        window = max(SEEN_IDS_WINDOW, len(emails))
+        added = 0
+        for i, email in enumerate(emails):
+            email.setdefault('id', f'item_{i}')
+            if email['id'] in seen_ids:
+                continue
+            seen_ids.add(email['id'])
+            seen_order.append(email['id'])
+            while len(seen_order) > window:
+                seen_ids.discard(seen_order.popleft())
+            total_queued += 1
+            priority = scheduler.submit(email)
+            logger.debug(f"Queued {email['id']} as {priority.name}")
+            added += 1
+        return added
+
+    # 4. Data Ingestion
+    queued = enqueue_new(fetch())
+
+    if not queued and not args.follow:
         logger.warning("No emails retrieved. Check configurations.")
         return
 
-    # 4. Processing Pipeline
-    results = []
-    logger.info(f"Found {len(emails)} items to process. Running extraction engine...")
-    
-    for i, email in enumerate(emails):
-        email_id = email.get('id', f'item_{i}')
-        logger.info(f"[{i+1}/{len(emails)}] Processing: {email_id}")
-        
-        result = extractor.process_item(email)
-        results.append(result.model_dump())
-        
-        # Incremental save (Checkpointing)
-        with open(settings.OUTPUT_PATH, "w", encoding='utf-8') as f:
-            json.dump(results, f, indent=2)
-            
-    logger.info(f"Extraction Pipeline Complete. Results saved to {settings.OUTPUT_PATH}")
+    # 5. Processing Pipeline
+    store = ResultStore(settings.RESULT_DB_PATH)
+    run_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+    processed = 0
+    lock = threading.Lock()
+    logger.info(f"Found {queued} items to process. Running extraction engine with {args.workers} worker(s)...")
+
+    def worker():
+        nonlocal processed
+        with tracer.profile_thread():
+            while True:
+                item = scheduler.next()
+                if item is None:
+                    return
+                email_id = item.email['id']
+                with lock:
+                    processed += 1
+                    position = processed
+                logger.info(f"[{position}/{total_queued}] Processing: {email_id} ({item.priority.name})")
+
+                with tracer.span(f"email {email_id}", priority=item.priority.name):
+                    result = extractor.process_item(item.email)
+                    scheduler.complete(item)
+
+                    # Incremental save (Checkpointing): one indexed row per result
+                    with tracer.span("checkpoint_write"):
+                        store.add(result.model_dump(), item.email, source=f"main:{args.source}", run_id=run_id)
+
+    threads = [threading.Thread(target=worker, name=f"worker-{n}", daemon=True) for n in range(max(1, args.workers))]
+    for t in threads:
+        t.start()
+
+    try:
+        while args.follow:
+            time.sleep(args.poll_interval)
+            added = enqueue_new(fetch())
+            if added:
+                logger.info(f"Follow mode: queued {added} new item(s), {scheduler.pending()} pending.")
+    except KeyboardInterrupt:
+        logger.info("Stopping follow mode. Draining queued items...")
+
+    scheduler.close()
+    for t in threads:
+        t.join()
+
+    scheduler.log_report()
+    stream_stats = extractor.stream_report()
+    if stream_stats.get("stream_calls"):
+        logger.info(
+            f"Streaming: {stream_stats['stream_calls']} calls, {stream_stats['stream_cut_off']} cut off early | "
+            f"time-to-first-field avg={stream_stats['stream_first_field_avg']:.2f}s | total avg={stream_stats['stream_total_avg']:.2f}s"
+        )
+
+    # JSON snapshot of this run for evaluate.py
+    store.export_to_path(settings.OUTPUT_PATH, "json", run_id=run_id)
+    store.close()
+    if args.profile:
+        tracer.export(args.profile)
+    logger.info(f"Extraction Pipeline Complete. Results saved to {settings.RESULT_DB_PATH} (run {run_id}) and {settings.OUTPUT_PATH}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,123 @@
+"""
+Local stand-in for an OpenAI-compatible model server (llama.cpp / vLLM style).
+Answers POST /v1/chat/completions with a canned extraction so the 'openai'
+backend and the benchmark can be exercised without a GPU or API key.
+
+    python mock_llm_server.py --port 8000 --latency 0.05 --token-delay 0.01
+    LLM_BACKEND=openai LLM_BASE_URL=http://localhost:8000/v1 python main.py
+"""
+
+import json
+import time
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CANNED_RESULT = {
+    "reasoning": "Mock server response.",
+    "product_line": "pl_sea_import_lcl",
+    "origin_port_code": "CNSHA",
+    "origin_port_name": "Shanghai",
+    "destination_port_code": "INMAA",
+    "destination_port_name": "Chennai",
+    "incoterm": "FOB",
+    "cargo_weight_kg": 1500.0,
+    "cargo_cbm": 5.2,
+    "is_dangerous": False
+}
+
+# Models often keep talking after the JSON; streaming clients can skip this
+TRAILING_TEXT = "\n\nNote: weights were taken as stated in the email. Let me know if you need rates for other ports as well."
+
+
+def tokenize(text: str, size: int = 4):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like real model servers
+    disable_nagle_algorithm = True  # headers and body go out in separate writes; avoid delayed-ACK stalls
+    latency = 0.0
+    token_delay = 0.0
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self.send_error(404)
+            return
+        if self.latency:
+            time.sleep(self.latency)
+
+        tokens = tokenize(json.dumps(CANNED_RESULT, indent=2) + TRAILING_TEXT)
+        if request.get("stream"):
+            self._stream(request, tokens)
+            return
+        # Non-streaming clients still wait for every token to be generated
+        time.sleep(self.token_delay * len(tokens))
+
+        body = json.dumps({
+            "id": "chatcmpl-mock",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "mock"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "".join(tokens)},
+                "finish_reason": "stop"
+            }]
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream(self, request: dict, tokens: list):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        try:
+            for token in tokens:
+                time.sleep(self.token_delay)
+                chunk = {
+                    "id": "chatcmpl-mock",
+                    "object": "chat.completion.chunk",
+                    "model": request.get("model", "mock"),
+                    "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}]
+                }
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+            self.wfile.write(b"data: [DONE]\n\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # client cut the stream off early; stop "generating"
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(host: str = "127.0.0.1", port: int = 0, latency: float = 0.0, token_delay: float = 0.0) -> ThreadingHTTPServer:
+    """Starts the mock server on a background thread. Port 0 picks a free port."""
+    handler = type("ConfiguredMockHandler", (MockHandler,), {"latency": latency, "token_delay": token_delay})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mock OpenAI-compatible chat completion server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated model time per request (seconds)")
+    parser.add_argument("--token-delay", type=float, default=0.0, help="Simulated generation time per token (seconds)")
+    args = parser.parse_args()
+
+    server = start_server(args.host, args.port, args.latency, args.token_delay)
+    print(f"Mock LLM server listening on http://{args.host}:{server.server_address[1]}/v1")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
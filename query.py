@@ -0,0 +1,53 @@
+import sys
+import json
+import argparse
+from datetime import datetime, timedelta, timezone
+from src.config import settings
+from src.storage.result_store import ResultStore
+
+def main():
+    parser = argparse.ArgumentParser(description="Query and export stored extraction results")
+    parser.add_argument("--db", default=settings.RESULT_DB_PATH, help="Path to the result store")
+    parser.add_argument("--origin", help="Origin UN/LOCODE (e.g. CNSHA)")
+    parser.add_argument("--destination", help="Destination UN/LOCODE (e.g. INMAA)")
+    parser.add_argument("--port", help="Match either origin or destination UN/LOCODE")
+    parser.add_argument("--product-line", choices=["pl_sea_import_lcl", "pl_sea_export_lcl"])
+    dg = parser.add_mutually_exclusive_group()
+    dg.add_argument("--dg", dest="is_dangerous", action="store_const", const=True, help="Only dangerous goods")
+    dg.add_argument("--non-dg", dest="is_dangerous", action="store_const", const=False, help="Only non-DG")
+    parser.add_argument("--since", help="From date/time (UTC), 'YYYY-MM-DD[ HH:MM:SS]'")
+    parser.add_argument("--until", help="Up to date/time (UTC), inclusive")
+    parser.add_argument("--days", type=int, help="Shortcut for --since N days ago (e.g. 7 for 'this week')")
+    parser.add_argument("--run-id", help="Results of a single main.py run")
+    parser.add_argument("--limit", type=int, default=20, help="Rows to print (newest first)")
+    parser.add_argument("--before-id", type=int, help="Keyset cursor: only rows with id below this (next page)")
+    parser.add_argument("--count", action="store_true", help="Only print the number of matching rows")
+    parser.add_argument("--export", metavar="PATH", help="Stream all matching rows to a file ('-' for stdout)")
+    parser.add_argument("--format", choices=["csv", "json"], help="Export format (default: from file extension, else csv)")
+    args = parser.parse_args()
+
+    since = args.since
+    if args.days is not None:
+        since = (datetime.now(timezone.utc) - timedelta(days=args.days)).strftime('%Y-%m-%d %H:%M:%S')
+
+    filters = dict(
+        origin=args.origin, destination=args.destination, port=args.port,
+        product_line=args.product_line, is_dangerous=args.is_dangerous,
+        since=since, until=args.until, run_id=args.run_id
+    )
+    store = ResultStore(args.db)
+
+    if args.count:
+        print(store.count(**filters))
+    elif args.export == "-":
+        store.export(sys.stdout, args.format or "csv", **filters)
+    elif args.export:
+        store.export_to_path(args.export, args.format, **filters)
+    else:
+        for row in store.query(limit=args.limit, before_id=args.before_id, **filters):
+            print(json.dumps(row))
+
+    store.close()
+
+if __name__ == "__main__":
+    main()
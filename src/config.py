@@ -1,12 +1,27 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import Optional
+from typing import Optional, List
 
 class Settings(BaseSettings):
-    GROQ_API_KEY: str
+    GROQ_API_KEY: Optional[str] = None
     MODEL_NAME: str = "llama-3.1-8b-instant"
     PROMPT_VERSION: str = "v6"
     SLEEP_TIME: float = 1.0
     
+    # LLM Backend Settings ("groq" or "openai" for any OpenAI-compatible server)
+    LLM_BACKEND: str = "groq"
+    LLM_BASE_URL: Optional[str] = None
+    LLM_API_KEY: Optional[str] = None
+    LLM_TIMEOUT: float = 60.0
+    LLM_CONNECT_TIMEOUT: float = 5.0
+    LLM_STREAMING: bool = False
+    
+    # Scheduling Settings
+    WORKERS: int = 1
+    POLL_INTERVAL: float = 30.0
+    URGENT_SENDERS: List[str] = []
+    HIGH_PRIORITY_SENDERS: List[str] = []
+    ESCALATE_AFTER: float = 900.0
+    
     # Email Settings
     EMAIL_HOST: Optional[str] = None
     EMAIL_USER: Optional[str] = None
@@ -15,8 +30,11 @@ class Settings(BaseSettings):
     
     # Path Settings
     PORT_CODES_REFERENCE_PATH: str = "data/port_codes_reference.json"
+    PORT_SNAPSHOT_PATH: Optional[str] = None  # default: next to the reference JSON, .snapshot
+    PORT_RELOAD_INTERVAL: float = 1.0
     INPUT_PATH: str = "data/emails_input.json"
     OUTPUT_PATH: str = "outputs/output_v6.json"
+    RESULT_DB_PATH: str = "outputs/results.db"
 
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
@@ -25,7 +25,9 @@ class EmailConnector(BaseConnector):
                     emails.append({
                         "id": f"email_{msg.uid}",
                         "subject": msg.subject,
-                        "body": msg.text or msg.html
+                        "body": msg.text or msg.html,
+                        "sender_email": msg.from_,
+                        "received_at": msg.date.isoformat() if msg.date else None
                     })
             logger.info(f"Successfully fetched {len(emails)} emails from cloud server.")
             return emails
@@ -0,0 +1,175 @@
+import json
+import threading
+from abc import ABC, abstractmethod
+from typing import List, Optional, Dict, Any, Callable, Iterator, Tuple, Type
+import httpx
+from loguru import logger
+from ..config import settings
+
+Messages = List[Dict[str, str]]
+
+
+class LLMBackend(ABC):
+    """Base class for chat-completion backends used by the ShipmentExtractor."""
+
+    name: str = "base"
+
+    @abstractmethod
+    def complete(self, model: str, messages: Messages, temperature: float = 0, json_mode: bool = True) -> str:
+        """Runs one chat completion and returns the assistant message content."""
+        pass
+
+    def stream(self, model: str, messages: Messages, temperature: float = 0, json_mode: bool = True) -> Iterator[str]:
+        """
+        Yields content deltas as they are generated. Closing the generator early
+        closes the underlying response so the server can stop generating.
+        Backends without streaming support yield the full completion once.
+        """
+        yield self.complete(model, messages, temperature=temperature, json_mode=json_mode)
+
+    def close(self) -> None:
+        pass
+
+
+BACKENDS: Dict[str, Type[LLMBackend]] = {}
+
+
+def register_backend(name: str) -> Callable[[Type[LLMBackend]], Type[LLMBackend]]:
+    """Class decorator adding a backend to the registry under `name`."""
+    def wrap(cls: Type[LLMBackend]) -> Type[LLMBackend]:
+        cls.name = name
+        BACKENDS[name] = cls
+        return cls
+    return wrap
+
+
+@register_backend("groq")
+class GroqBackend(LLMBackend):
+    """Hosted GroqCloud API via the official SDK."""
+
+    def __init__(self, api_key: Optional[str] = None, pool_size: Optional[int] = None, timeout: Optional[float] = None, **_: Any):
+        from groq import Groq
+        api_key = api_key or settings.GROQ_API_KEY
+        if not api_key:
+            raise ValueError("GROQ_API_KEY is required for the 'groq' backend")
+        pool_size = max(1, pool_size or settings.WORKERS)
+        self.client = Groq(
+            api_key=api_key,
+            timeout=timeout or settings.LLM_TIMEOUT,
+            http_client=httpx.Client(limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size))
+        )
+
+    def complete(self, model: str, messages: Messages, temperature: float = 0, json_mode: bool = True) -> str:
+        kwargs = {"response_format": {"type": "json_object"}} if json_mode else {}
+        response = self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            **kwargs
+        )
+        return response.choices[0].message.content
+
+    def stream(self, model: str, messages: Messages, temperature: float = 0, json_mode: bool = True) -> Iterator[str]:
+        kwargs = {"response_format": {"type": "json_object"}} if json_mode else {}
+        response = self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            stream=True,
+            **kwargs
+        )
+        try:
+            for chunk in response:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    yield delta
+        finally:
+            response.close()
+
+    def close(self) -> None:
+        self.client.close()
+
+
+@register_backend("openai")
+class OpenAICompatibleBackend(LLMBackend):
+    """
+    Generic OpenAI-compatible HTTP backend (llama.cpp server, vLLM, TGI, ...).
+    One httpx.Client is shared per backend instance, so all workers reuse a
+    keep-alive connection pool sized to the worker concurrency.
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        pool_size: Optional[int] = None,
+        timeout: Optional[float] = None,
+        connect_timeout: Optional[float] = None,
+        keep_alive: bool = True,
+        **_: Any
+    ):
+        base_url = base_url or settings.LLM_BASE_URL
+        if not base_url:
+            raise ValueError("LLM_BASE_URL is required for the 'openai' backend")
+        pool_size = max(1, pool_size or settings.WORKERS)
+        api_key = api_key or settings.LLM_API_KEY
+        headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        self.client = httpx.Client(
+            base_url=base_url.rstrip("/"),
+            headers=headers,
+            limits=httpx.Limits(
+                max_connections=pool_size,
+                max_keepalive_connections=pool_size if keep_alive else 0
+            ),
+            timeout=httpx.Timeout(timeout or settings.LLM_TIMEOUT, connect=connect_timeout or settings.LLM_CONNECT_TIMEOUT)
+        )
+        logger.debug(f"OpenAI-compatible backend at {base_url} (pool={pool_size}, keep_alive={keep_alive})")
+
+    def complete(self, model: str, messages: Messages, temperature: float = 0, json_mode: bool = True) -> str:
+        payload: Dict[str, Any] = {"model": model, "messages": messages, "temperature": temperature}
+        if json_mode:
+            payload["response_format"] = {"type": "json_object"}
+        response = self.client.post("/chat/completions", json=payload)
+        response.raise_for_status()
+        return response.json()["choices"][0]["message"]["content"]
+
+    def stream(self, model: str, messages: Messages, temperature: float = 0, json_mode: bool = True) -> Iterator[str]:
+        payload: Dict[str, Any] = {"model": model, "messages": messages, "temperature": temperature, "stream": True}
+        if json_mode:
+            payload["response_format"] = {"type": "json_object"}
+        # Server-sent events: "data: {chunk}" lines terminated by "data: [DONE]"
+        with self.client.stream("POST", "/chat/completions", json=payload) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                choices = json.loads(data).get("choices") or []
+                delta = (choices[0].get("delta") or {}).get("content") if choices else None
+                if delta:
+                    yield delta
+
+    def close(self) -> None:
+        self.client.close()
+
+
+_shared: Dict[Tuple[str, Optional[int]], LLMBackend] = {}
+_shared_lock = threading.Lock()
+
+
+def get_backend(name: Optional[str] = None, pool_size: Optional[int] = None) -> LLMBackend:
+    """
+    Returns the process-wide backend instance for `name` (default: settings.LLM_BACKEND)
+    with a connection pool of `pool_size` (default: settings.WORKERS).
+    Instances are cached so repeated ShipmentExtractor construction reuses one connection pool.
+    """
+    name = name or settings.LLM_BACKEND
+    key = (name, pool_size)
+    with _shared_lock:
+        if key not in _shared:
+            if name not in BACKENDS:
+                raise ValueError(f"Unknown LLM backend '{name}'. Available: {', '.join(sorted(BACKENDS))}")
+            _shared[key] = BACKENDS[name](pool_size=pool_size)
+        return _shared[key]
@@ -1,12 +1,28 @@
 import json
 import time
-import os
+import threading
 from typing import List, Optional, Dict, Any
-from groq import Groq
 from loguru import logger
+from pydantic import ValidationError
 from ..config import settings
 from ..schemas import ExtractionResult
 from ..prompts import PROMPTS
+from ..profiling import tracer
+from .backends import LLMBackend, get_backend
+from .streaming import IncrementalJSONObjectParser
+from .port_reference import get_port_reference
+
+# Fields the model is asked to return; once all are in, streaming stops early
+STREAM_FIELDS = set(ExtractionResult.model_fields) - {"id"}
+
+
+def parse_json_response(text: str) -> Any:
+    """Decodes the first JSON object/array in `text`, ignoring any prose before or after it."""
+    starts = [i for i in (text.find("{"), text.find("[")) if i != -1]
+    if not starts:
+        raise ValueError("No JSON object in response")
+    value, _ = json.JSONDecoder().raw_decode(text, min(starts))
+    return value
 
 class ShipmentExtractor:
     """
@@ -14,50 +30,50 @@ class ShipmentExtractor:
     Handles LLM communication, context management, and reliability protocols.
     """
     
-    def __init__(self):
-        self.client = Groq(api_key=settings.GROQ_API_KEY)
+    def __init__(self, backend: Optional[LLMBackend] = None):
+        self.backend = backend or get_backend()
         self.model = settings.MODEL_NAME
         self.version = settings.PROMPT_VERSION
-        self.port_reference = self._load_port_reference()
+        self.ports = get_port_reference()
+        self.streaming = settings.LLM_STREAMING
+        # Running totals (not per-call records) so long --follow runs stay bounded
+        self._stats_lock = threading.Lock()
+        self.call_stats: Dict[str, float] = {
+            "full_calls": 0, "full_total": 0.0,
+            "stream_calls": 0, "stream_total": 0.0, "stream_cut_off": 0,
+            "stream_first_field_calls": 0, "stream_first_field_total": 0.0
+        }
         
-    def _load_port_reference(self) -> str:
-        path = settings.PORT_CODES_REFERENCE_PATH
-        if not os.path.exists(path):
-            logger.warning(f"Port Reference Data not found at {path}. System fidelity might be limited.")
-            return "No reference data loaded."
-            
-        try:
-            with open(path, "r", encoding='utf-8') as f:
-                data = json.load(f)
-                context_parts = []
-                for item in data:
-                    base = f"{item['code']}:{item['name']}"
-                    aliases = item.get("aliases", [])
-                    aliases = [a for a in aliases if a.lower() != item['name'].lower()]
-                    if aliases:
-                        base += f"[{'/'.join(aliases)}]"
-                    context_parts.append(base)
-                return ", ".join(context_parts)
-        except Exception as e:
-            logger.error(f"Integrity Error: Failed to parse port reference: {e}")
-            return "Error loading reference data."
+    @property
+    def port_reference(self) -> str:
+        # Read per call so edits to the reference JSON reach long-running workers
+        return self.ports.prompt_context
 
     def extract_from_content(self, content: str, retries: int = 3) -> Dict[str, Any]:
-        template = PROMPTS.get(self.version, PROMPTS["v6"])
-        system_prompt = template.format(port_reference=self.port_reference, user_input="{user_input}").replace("{user_input}", content)
-        
+        with tracer.span("prompt_build"):
+            template = PROMPTS.get(self.version, PROMPTS["v6"])
+            system_prompt = template.format(port_reference=self.port_reference, user_input="{user_input}").replace("{user_input}", content)
+            messages = [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": content}
+            ]
+
         for attempt in range(retries):
             try:
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": content}
-                    ],
-                    temperature=0,
-                    response_format={"type": "json_object"}
-                )
-                return json.loads(response.choices[0].message.content)
+                if self.streaming:
+                    return self._extract_streaming(messages)
+                start = time.perf_counter()
+                with tracer.span("api_wait", attempt=attempt + 1):
+                    response = self.backend.complete(
+                        model=self.model,
+                        messages=messages,
+                        temperature=0,
+                        json_mode=True
+                    )
+                with tracer.span("parse"):
+                    data = parse_json_response(response)
+                self._record(full_calls=1, full_total=time.perf_counter() - start)
+                return data
             except Exception as e:
                 wait = (attempt + 1) * 5
                 logger.warning(f"LLM API Transient Error ({attempt+1}/{retries}): {e}. Retrying in {wait}s...")
@@ -65,6 +81,84 @@ class ShipmentExtractor:
         
         return {}
 
+    def _validate_field(self, key: str, value: Any) -> bool:
+        """Validates one field against the schema in isolation (all other fields are optional)."""
+        if key not in STREAM_FIELDS:
+            return False
+        try:
+            ExtractionResult.model_validate({"id": "_", key: value})
+            return True
+        except ValidationError as e:
+            logger.warning(f"Streamed field '{key}' failed validation and was dropped: {e.errors()[0]['msg']}")
+            return False
+
+    def _extract_streaming(self, messages: List[Dict[str, str]]) -> Dict[str, Any]:
+        """
+        Consumes the completion token by token, validating each field as soon as
+        its value is complete. Generation is cut off once the JSON object closes
+        or every expected field has arrived, skipping any trailing text.
+        """
+        parser = IncrementalJSONObjectParser()
+        data: Dict[str, Any] = {}
+        start = time.perf_counter()
+        first_field = None
+        cut_off = False
+        stream = self.backend.stream(model=self.model, messages=messages, temperature=0, json_mode=True)
+        # Parsing and per-field validation happen inside the stream, so they nest under api_wait
+        with tracer.span("api_wait", streaming=True):
+            try:
+                for delta in stream:
+                    for key, value in parser.feed(delta):
+                        if first_field is None:
+                            first_field = time.perf_counter() - start
+                        with tracer.span("validate_field", field=key):
+                            if self._validate_field(key, value):
+                                data[key] = value
+                    if parser.done or STREAM_FIELDS <= parser.fields.keys():
+                        cut_off = True
+                        break
+            finally:
+                stream.close()
+
+        if not parser.started:
+            raise ValueError("No JSON object in streamed response")
+        if not cut_off:
+            # Truncated (max_tokens, early EOF): retry like an unparseable full completion
+            raise ValueError(f"Stream ended before the JSON object was complete ({len(parser.fields)} fields received)")
+        self._record(
+            stream_calls=1,
+            stream_total=time.perf_counter() - start,
+            stream_cut_off=int(cut_off),
+            stream_first_field_calls=int(first_field is not None),
+            stream_first_field_total=first_field or 0.0
+        )
+        return data
+
+    def _record(self, **increments: float) -> None:
+        with self._stats_lock:
+            for key, value in increments.items():
+                self.call_stats[key] += value
+
+    def stream_report(self) -> Dict[str, float]:
+        """Time-to-first-field and latency for streamed calls, with saving vs full completions when both were run."""
+        with self._stats_lock:
+            stats = dict(self.call_stats)
+        report: Dict[str, float] = {}
+        if stats["stream_calls"]:
+            report["stream_calls"] = stats["stream_calls"]
+            report["stream_cut_off"] = stats["stream_cut_off"]
+            report["stream_first_field_avg"] = (
+                stats["stream_first_field_total"] / stats["stream_first_field_calls"]
+                if stats["stream_first_field_calls"] else 0.0
+            )
+            report["stream_total_avg"] = stats["stream_total"] / stats["stream_calls"]
+        if stats["full_calls"]:
+            report["full_calls"] = stats["full_calls"]
+            report["full_total_avg"] = stats["full_total"] / stats["full_calls"]
+        if stats["stream_calls"] and stats["full_calls"]:
+            report["saved_avg"] = report["full_total_avg"] - report["stream_total_avg"]
+        return report
+
     def process_item(self, email_data: Dict[str, Any]) -> ExtractionResult:
         email_id = email_data.get("id", "UNKN")
         content = f"Subject: {email_data.get('subject', '')}\nBody: {email_data.get('body', '')}"
@@ -73,7 +167,8 @@ class ShipmentExtractor:
             raw_data = self.extract_from_content(content)
             if isinstance(raw_data, list): raw_data = raw_data[0] if raw_data else {}
             raw_data['id'] = email_id
-            return ExtractionResult(**raw_data)
+            with tracer.span("validation"):
+                return ExtractionResult(**raw_data)
         except Exception as e:
             logger.error(f"Extraction failed for {email_id}: {e}")
             return ExtractionResult(id=email_id)
@@ -0,0 +1,278 @@
+import os
+import re
+import json
+import time
+import hashlib
+import argparse
+import threading
+from dataclasses import dataclass
+from typing import List, Optional, Dict, Any, Tuple
+from loguru import logger
+from ..config import settings
+
+SNAPSHOT_MAGIC = b"PORTREF\n"
+SNAPSHOT_VERSION = 1
+
+
+def normalize_alias(text: str) -> str:
+    """Lookup key for names/aliases: casefolded, single-spaced, trimmed."""
+    return re.sub(r"\s+", " ", str(text)).strip().casefold()
+
+
+@dataclass(frozen=True)
+class PortSnapshot:
+    """
+    Compiled, deduplicated port catalog.
+
+    names:     code -> canonical name
+    variants:  code -> every distinct source name for that code (canonical first)
+    aliases:   normalized alias/name/code -> codes it may refer to
+    countries: ISO country prefix -> codes
+    prompt_context: pre-rendered 'CODE:Name[Alias/...]' string for the prompt
+    """
+    source_path: str
+    source_mtime_ns: int
+    source_size: int
+    source_sha256: str
+    names: Dict[str, str]
+    variants: Dict[str, Tuple[str, ...]]
+    aliases: Dict[str, Tuple[str, ...]]
+    countries: Dict[str, Tuple[str, ...]]
+    prompt_context: str
+
+    def lookup(self, alias: str) -> Optional[str]:
+        """Best code for an alias (first match when several ports share it)."""
+        codes = self.aliases.get(normalize_alias(alias))
+        return codes[0] if codes else None
+
+    def canonical_name(self, code: str) -> Optional[str]:
+        return self.names.get(code.strip().upper())
+
+
+def _pick_canonical(names: List[str]) -> str:
+    # Prefer the name contained in most variants ('Chennai' over 'Chennai ICD'), then the shortest
+    def score(name: str) -> Tuple[int, int]:
+        key = name.casefold()
+        return (-sum(1 for other in names if key in other.casefold()), len(name))
+    return min(names, key=score)
+
+
+def _render_prompt_context(data: List[Dict[str, Any]]) -> str:
+    # Same rendering the extractor has always used, so prompts (and accuracy) are unchanged
+    context_parts = []
+    for item in data:
+        base = f"{item['code']}:{item['name']}"
+        aliases = [a for a in item.get("aliases", []) if a.lower() != item['name'].lower()]
+        if aliases:
+            base += f"[{'/'.join(aliases)}]"
+        context_parts.append(base)
+    return ", ".join(context_parts)
+
+
+def compile_reference(source_path: str) -> PortSnapshot:
+    """Parses, normalizes and deduplicates the JSON catalog into a PortSnapshot."""
+    with open(source_path, "rb") as f:
+        raw = f.read()
+    stat = os.stat(source_path)
+    data = json.loads(raw.decode("utf-8"))
+
+    entries: List[Dict[str, Any]] = []
+    variants: Dict[str, List[str]] = {}
+    alias_lists: Dict[str, List[str]] = {}
+    seen = set()
+    for item in data:
+        code = str(item.get("code") or "").strip().upper()
+        name = re.sub(r"\s+", " ", str(item.get("name") or "")).strip()
+        if len(code) != 5 or not name:
+            logger.warning(f"Skipping invalid port reference entry: {item}")
+            continue
+        aliases = [re.sub(r"\s+", " ", str(a)).strip() for a in item.get("aliases", []) if str(a).strip()]
+        if (code, name.casefold()) in seen:
+            continue
+        seen.add((code, name.casefold()))
+        entries.append({"code": code, "name": name, "aliases": aliases})
+
+        code_variants = variants.setdefault(code, [])
+        code_variants.append(name)
+        code_aliases = alias_lists.setdefault(code, [])
+        for alias in aliases:
+            if alias.casefold() not in {a.casefold() for a in code_aliases}:
+                code_aliases.append(alias)
+
+    names: Dict[str, str] = {}
+    alias_index: Dict[str, List[str]] = {}
+    countries: Dict[str, List[str]] = {}
+
+    def index(key: str, code: str) -> None:
+        codes = alias_index.setdefault(normalize_alias(key), [])
+        if code not in codes:
+            codes.append(code)
+
+    for code, code_variants in variants.items():
+        canonical = _pick_canonical(code_variants)
+        names[code] = canonical
+        variants[code] = [canonical] + [v for v in code_variants if v != canonical]
+        countries.setdefault(code[:2], []).append(code)
+        index(code, code)
+        for text in variants[code] + alias_lists[code]:
+            index(text, code)
+
+    snapshot = PortSnapshot(
+        source_path=os.path.abspath(source_path),
+        source_mtime_ns=stat.st_mtime_ns,
+        source_size=stat.st_size,
+        source_sha256=hashlib.sha256(raw).hexdigest(),
+        names=names,
+        variants={code: tuple(v) for code, v in variants.items()},
+        aliases={key: tuple(codes) for key, codes in alias_index.items()},
+        countries={country: tuple(codes) for country, codes in countries.items()},
+        prompt_context=_render_prompt_context(entries)
+    )
+    logger.info(f"Compiled port reference {source_path}: {len(data)} entries -> {len(names)} ports, {len(alias_index)} aliases")
+    return snapshot
+
+
+def default_snapshot_path(source_path: str) -> str:
+    return settings.PORT_SNAPSHOT_PATH or os.path.splitext(source_path)[0] + ".snapshot"
+
+
+def write_snapshot(snapshot: PortSnapshot, path: str) -> None:
+    """
+    Atomically writes the snapshot: magic header, then compact JSON. Plain data
+    only, so reading a tampered snapshot cannot execute code.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(SNAPSHOT_MAGIC)
+        payload = {"version": SNAPSHOT_VERSION, **snapshot.__dict__}
+        f.write(json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+    os.replace(tmp, path)
+
+
+def read_snapshot(path: str) -> Optional[PortSnapshot]:
+    try:
+        with open(path, "rb") as f:
+            if f.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+                return None
+            fields = json.loads(f.read().decode("utf-8"))
+        if fields.pop("version", None) != SNAPSHOT_VERSION:
+            return None
+        # JSON has no tuples; restore the immutable shapes
+        for key in ("variants", "aliases", "countries"):
+            fields[key] = {k: tuple(v) for k, v in fields[key].items()}
+        return PortSnapshot(**fields)
+    except (OSError, TypeError, ValueError, KeyError, AttributeError):
+        return None
+
+
+def load_snapshot(source_path: str, snapshot_path: Optional[str] = None) -> PortSnapshot:
+    """
+    Returns an up-to-date snapshot for `source_path`, reading the compiled file
+    when it matches the source and recompiling (and rewriting it) otherwise.
+    """
+    snapshot_path = snapshot_path or default_snapshot_path(source_path)
+    stat = os.stat(source_path)
+    snapshot = read_snapshot(snapshot_path)
+    if snapshot and snapshot.source_path != os.path.abspath(source_path):
+        snapshot = None
+    if snapshot and (snapshot.source_mtime_ns, snapshot.source_size) == (stat.st_mtime_ns, stat.st_size):
+        return snapshot
+    if snapshot:
+        # Touched but possibly unchanged: compare content before recompiling
+        with open(source_path, "rb") as f:
+            if hashlib.sha256(f.read()).hexdigest() == snapshot.source_sha256:
+                return snapshot
+    snapshot = compile_reference(source_path)
+    try:
+        write_snapshot(snapshot, snapshot_path)
+    except OSError as e:
+        logger.warning(f"Could not write port reference snapshot to {snapshot_path}: {e}")
+    return snapshot
+
+
+class PortReference:
+    """
+    Hot-reloading handle on the compiled port catalog.
+    Accessing `snapshot` re-checks the source file at most every `check_interval`
+    seconds and swaps in a recompiled snapshot when it has changed, so
+    long-running workers pick up edits without a restart.
+    """
+
+    def __init__(self, source_path: str, snapshot_path: Optional[str] = None, check_interval: float = 1.0):
+        self.source_path = source_path
+        self.snapshot_path = snapshot_path or default_snapshot_path(source_path)
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._snapshot: Optional[PortSnapshot] = None
+        self._checked_at = 0.0
+        self._source_stat: Optional[Tuple[int, int]] = None
+        self._reload()
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.source_path)
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+
+    def _reload(self) -> None:
+        self._source_stat = self._stat()
+        try:
+            self._snapshot = load_snapshot(self.source_path, self.snapshot_path)
+        except FileNotFoundError:
+            if self._snapshot is None:
+                logger.warning(f"Port Reference Data not found at {self.source_path}. System fidelity might be limited.")
+        except Exception as e:
+            # Keep serving the last good snapshot if an edit left the file broken
+            logger.error(f"Integrity Error: Failed to parse port reference: {e}")
+        self._checked_at = time.monotonic()
+
+    @property
+    def snapshot(self) -> Optional[PortSnapshot]:
+        if time.monotonic() - self._checked_at >= self.check_interval:
+            with self._lock:
+                if time.monotonic() - self._checked_at >= self.check_interval:
+                    current = self._snapshot
+                    # Each version of the file is tried once, so a broken edit is not re-parsed every interval
+                    if self._stat() != self._source_stat:
+                        self._reload()
+                        if self._snapshot is not current and current is not None:
+                            logger.info(f"Port reference reloaded from {self.source_path}")
+                    else:
+                        self._checked_at = time.monotonic()
+        return self._snapshot
+
+    @property
+    def prompt_context(self) -> str:
+        snapshot = self.snapshot
+        return snapshot.prompt_context if snapshot else "No reference data loaded."
+
+
+_shared: Dict[str, PortReference] = {}
+_shared_lock = threading.Lock()
+
+
+def get_port_reference(source_path: Optional[str] = None) -> PortReference:
+    """Process-wide PortReference per source file, so repeated extractor construction is free."""
+    source_path = source_path or settings.PORT_CODES_REFERENCE_PATH
+    with _shared_lock:
+        if source_path not in _shared:
+            _shared[source_path] = PortReference(source_path, check_interval=settings.PORT_RELOAD_INTERVAL)
+        return _shared[source_path]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compile the port reference JSON into a snapshot")
+    parser.add_argument("--source", default=settings.PORT_CODES_REFERENCE_PATH)
+    parser.add_argument("--output", default=None, help="Snapshot path (default: next to the source, .snapshot)")
+    args = parser.parse_args()
+
+    compiled = compile_reference(args.source)
+    out_path = args.output or default_snapshot_path(args.source)
+    write_snapshot(compiled, out_path)
+    start = time.perf_counter()
+    read_snapshot(out_path)
+    logger.info(f"Snapshot written to {out_path} ({os.path.getsize(out_path)} bytes, loads in {(time.perf_counter() - start) * 1e3:.2f} ms)")
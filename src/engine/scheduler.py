@@ -0,0 +1,280 @@
+import re
+import time
+import math
+import heapq
+import threading
+import itertools
+from collections import deque
+from enum import IntEnum
+from datetime import datetime, timezone
+from dataclasses import dataclass, field
+from typing import List, Optional, Dict, Any, Tuple, Deque
+from loguru import logger
+
+
+class Priority(IntEnum):
+    """Scheduling classes. Lower value is served first."""
+    URGENT = 0
+    HIGH = 1
+    NORMAL = 2
+
+
+# Default rules: subject keywords that signal a customer waiting on a quote.
+DEFAULT_SUBJECT_RULES: List[Tuple[str, Priority]] = [
+    (r"\bURGENT\b|\bASAP\b|\bIMMEDIATE(LY)?\b|!{3,}", Priority.URGENT),
+    (r"\bRATE\s*REQ\b|\bRFQ\b|\bQUOTE\b|\bDG\b", Priority.HIGH),
+]
+
+# Answer-within targets (seconds) per class, used to order items inside a class.
+DEFAULT_DEADLINES: Dict[Priority, float] = {
+    Priority.URGENT: 5 * 60,
+    Priority.HIGH: 30 * 60,
+    Priority.NORMAL: 4 * 60 * 60,
+}
+
+# Most recent samples per class kept for the percentiles; averages use running totals
+STATS_WINDOW = 1000
+
+
+@dataclass(order=True)
+class ScheduledItem:
+    """A queued email. Ordering is (priority, deadline, arrival sequence)."""
+    priority: Priority
+    deadline: float
+    seq: int
+    email: Dict[str, Any] = field(compare=False)
+    received_at: float = field(compare=False)
+    enqueued_at: float = field(compare=False)
+    started_at: Optional[float] = field(default=None, compare=False)
+    base_priority: Priority = field(default=Priority.NORMAL, compare=False)
+
+
+class PriorityRules:
+    """
+    Maps an email to a Priority using subject patterns, sender lists and age.
+    Emails move up one class for every `escalate_after` seconds they have waited.
+    """
+
+    def __init__(
+        self,
+        subject_rules: Optional[List[Tuple[str, Priority]]] = None,
+        urgent_senders: Optional[List[str]] = None,
+        high_senders: Optional[List[str]] = None,
+        escalate_after: float = 15 * 60,
+    ):
+        rules = subject_rules if subject_rules is not None else DEFAULT_SUBJECT_RULES
+        self.subject_rules = [(re.compile(p, re.IGNORECASE), prio) for p, prio in rules]
+        self.urgent_senders = [s.lower() for s in (urgent_senders or [])]
+        self.high_senders = [s.lower() for s in (high_senders or [])]
+        self.escalate_after = escalate_after
+
+    @staticmethod
+    def _sender_matches(sender: str, patterns: List[str]) -> bool:
+        # Entries starting with '@' match a whole domain, anything else is an exact address
+        return any(sender.endswith(p) if p.startswith("@") else sender == p for p in patterns)
+
+    def classify(self, email: Dict[str, Any], age: float = 0.0) -> Priority:
+        return self.escalate(self.base_priority(email), age)
+
+    def escalate(self, priority: Priority, age: float) -> Priority:
+        if self.escalate_after <= 0 or age < self.escalate_after:
+            return priority
+        return Priority(max(Priority.URGENT, priority - int(age // self.escalate_after)))
+
+    def base_priority(self, email: Dict[str, Any]) -> Priority:
+        """Priority from subject and sender rules alone (before age escalation)."""
+        priority = Priority.NORMAL
+        subject = email.get("subject") or ""
+        for pattern, prio in self.subject_rules:
+            if prio < priority and pattern.search(subject):
+                priority = prio
+
+        sender = (email.get("sender_email") or "").strip().lower()
+        if sender:
+            if self._sender_matches(sender, self.urgent_senders):
+                priority = Priority.URGENT
+            elif priority > Priority.HIGH and self._sender_matches(sender, self.high_senders):
+                priority = Priority.HIGH
+        return priority
+
+
+def _parse_received_at(value: Any) -> Optional[float]:
+    """Accepts epoch seconds, datetime or ISO-8601 strings. Returns epoch seconds."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        dt = value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def _percentile(values: Deque[float], pct: float) -> float:
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[idx]
+
+
+class PriorityScheduler:
+    """
+    Thread-safe priority queue sitting in front of the extraction workers.
+
+    Items are served by class (URGENT > HIGH > NORMAL) and, within a class, by
+    earliest deadline. Because workers pull one item at a time, urgent mail
+    submitted while a backlog is pending is served by the next free worker.
+    In-flight LLM calls are never interrupted.
+    """
+
+    def __init__(
+        self,
+        rules: Optional[PriorityRules] = None,
+        deadlines: Optional[Dict[Priority, float]] = None,
+        stats_window: int = STATS_WINDOW,
+    ):
+        self.rules = rules or PriorityRules()
+        self.deadlines = deadlines or DEFAULT_DEADLINES
+        self._heap: List[ScheduledItem] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._closed = False
+        # Running totals for averages, bounded windows for percentiles, so long
+        # --follow runs keep constant memory
+        self._totals: Dict[Priority, Dict[str, float]] = {
+            p: {"wait_count": 0, "wait_total": 0.0, "count": 0, "latency_total": 0.0, "latency_max": 0.0}
+            for p in Priority
+        }
+        self._windows: Dict[Priority, Dict[str, Deque[float]]] = {
+            p: {"wait": deque(maxlen=stats_window), "latency": deque(maxlen=stats_window)} for p in Priority
+        }
+        self._missed: Dict[Priority, int] = {p: 0 for p in Priority}
+        self._next_escalation = math.inf
+
+    def _escalation_due(self, item: ScheduledItem) -> float:
+        """Epoch time at which `item` next moves up a class (inf if it cannot)."""
+        if item.priority == Priority.URGENT or self.rules.escalate_after <= 0:
+            return math.inf
+        levels = item.base_priority - item.priority
+        return item.received_at + (levels + 1) * self.rules.escalate_after
+
+    def _escalate_aged(self, now: float) -> None:
+        """Promotes queued items that have aged past their next escalation point. Caller holds the lock."""
+        if now < self._next_escalation:
+            return
+        promoted = 0
+        next_due = math.inf
+        for item in self._heap:
+            target = self.rules.escalate(item.base_priority, now - item.received_at)
+            if target < item.priority:
+                item.priority = target
+                item.deadline = item.received_at + self.deadlines[target]
+                promoted += 1
+            next_due = min(next_due, self._escalation_due(item))
+        if promoted:
+            heapq.heapify(self._heap)
+            logger.info(f"Escalated {promoted} aged item(s) waiting in the queue")
+        self._next_escalation = next_due
+
+    def submit(self, email: Dict[str, Any]) -> Priority:
+        now = time.time()
+        received_at = _parse_received_at(email.get("received_at"))
+        if received_at is None or received_at > now:
+            received_at = now
+        base_priority = self.rules.base_priority(email)
+        priority = self.rules.escalate(base_priority, now - received_at)
+        item = ScheduledItem(
+            priority=priority,
+            deadline=received_at + self.deadlines[priority],
+            seq=next(self._seq),
+            email=email,
+            received_at=received_at,
+            enqueued_at=now,
+            base_priority=base_priority,
+        )
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Scheduler is closed")
+            heapq.heappush(self._heap, item)
+            self._next_escalation = min(self._next_escalation, self._escalation_due(item))
+            if self._heap[0] is item and len(self._heap) > 1:
+                logger.info(f"{priority.name} item {email.get('id', 'UNKN')} moved to front of queue ({len(self._heap) - 1} pending behind it)")
+            self._cond.notify()
+        return priority
+
+    def next(self, timeout: Optional[float] = None) -> Optional[ScheduledItem]:
+        """Blocks until an item is available. Returns None once closed and drained, or on timeout."""
+        with self._cond:
+            end = None if timeout is None else time.monotonic() + timeout
+            while not self._heap:
+                if self._closed:
+                    return None
+                remaining = None if end is None else end - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+            self._escalate_aged(time.time())
+            item = heapq.heappop(self._heap)
+            item.started_at = time.time()
+            wait = item.started_at - item.enqueued_at
+            totals = self._totals[item.priority]
+            totals["wait_count"] += 1
+            totals["wait_total"] += wait
+            self._windows[item.priority]["wait"].append(wait)
+            return item
+
+    def complete(self, item: ScheduledItem) -> None:
+        done = time.time()
+        latency = done - item.received_at
+        with self._cond:
+            totals = self._totals[item.priority]
+            totals["count"] += 1
+            totals["latency_total"] += latency
+            totals["latency_max"] = max(totals["latency_max"], latency)
+            self._windows[item.priority]["latency"].append(latency)
+            if done > item.deadline:
+                self._missed[item.priority] += 1
+
+    def close(self) -> None:
+        """Stops accepting work. Workers drain remaining items, then next() returns None."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._heap)
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        """
+        Per-priority queue wait and end-to-end latency (seconds). Averages and max
+        cover the whole run; percentiles cover the last `stats_window` items.
+        """
+        report = {}
+        with self._cond:
+            for prio in Priority:
+                totals = self._totals[prio]
+                if not totals["count"]:
+                    continue
+                windows = self._windows[prio]
+                report[prio.name] = {
+                    "count": int(totals["count"]),
+                    "wait_avg": totals["wait_total"] / totals["wait_count"],
+                    "wait_p95": _percentile(windows["wait"], 95),
+                    "latency_avg": totals["latency_total"] / totals["count"],
+                    "latency_p50": _percentile(windows["latency"], 50),
+                    "latency_p95": _percentile(windows["latency"], 95),
+                    "latency_max": totals["latency_max"],
+                    "deadline_missed": self._missed[prio],
+                }
+        return report
+
+    def log_report(self) -> None:
+        for name, s in self.report().items():
+            logger.info(
+                f"[{name}] n={s['count']} | queue wait avg={s['wait_avg']:.2f}s p95={s['wait_p95']:.2f}s | "
+                f"e2e latency avg={s['latency_avg']:.2f}s p50={s['latency_p50']:.2f}s "
+                f"p95={s['latency_p95']:.2f}s max={s['latency_max']:.2f}s | deadline missed={s['deadline_missed']}"
+            )
@@ -0,0 +1,94 @@
+import json
+from typing import List, Optional, Dict, Any, Tuple
+
+
+class IncrementalJSONObjectParser:
+    """
+    Parses a single top-level JSON object from streamed text chunks.
+
+    Each call to `feed` returns the (key, value) pairs whose values became
+    complete in that chunk, so callers can validate fields while the model is
+    still generating. `done` is set once the closing brace of the top-level
+    object is seen; any text after it (and any text before the opening brace)
+    is ignored.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.pos = 0
+        self.started = False
+        self.done = False
+        self.fields: Dict[str, Any] = {}
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._key: Optional[str] = None
+        self._token_start: Optional[int] = None  # start of the current key or value
+        self._expect = "key"  # "key" | "colon" | "value"
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        completed: List[Tuple[str, Any]] = []
+        if self.done:
+            return completed
+        self.buffer += chunk
+        buf = self.buffer
+        while self.pos < len(buf):
+            ch = buf[self.pos]
+            i = self.pos
+            self.pos += 1
+
+            if not self.started:
+                if ch == "{":
+                    self.started = True
+                    self._depth = 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._expect == "key":
+                        self._key = json.loads(buf[self._token_start:i + 1])
+                        self._token_start = None
+                        self._expect = "colon"
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                if self._depth == 1 and self._expect == "key":
+                    self._token_start = i
+                elif self._depth == 1 and self._expect == "value" and self._token_start is None:
+                    self._token_start = i
+            elif ch == ":" and self._depth == 1 and self._expect == "colon":
+                self._expect = "value"
+            elif ch in "{[":
+                if self._depth == 1 and self._expect == "value" and self._token_start is None:
+                    self._token_start = i
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._finish_value(buf, i, completed)
+                    self.done = True
+                    break
+            elif ch == "," and self._depth == 1:
+                self._finish_value(buf, i, completed)
+            elif self._depth == 1 and self._expect == "value" and self._token_start is None and not ch.isspace():
+                self._token_start = i  # number / true / false / null
+        return completed
+
+    def _finish_value(self, buf: str, end: int, completed: List[Tuple[str, Any]]) -> None:
+        if self._expect == "value" and self._key is not None and self._token_start is not None:
+            raw = buf[self._token_start:end].strip()
+            try:
+                value = json.loads(raw)
+            except json.JSONDecodeError:
+                value = None
+            self.fields[self._key] = value
+            completed.append((self._key, value))
+        self._key = None
+        self._token_start = None
+        self._expect = "key"
@@ -0,0 +1,167 @@
+import os
+import io
+import sys
+import json
+import time
+import pstats
+import cProfile
+import threading
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from typing import List, Optional, Dict, Any
+from loguru import logger
+
+_NOOP = nullcontext()
+
+
+class Tracer:
+    """
+    Records nested timing spans as Chrome trace events (open in chrome://tracing
+    or https://ui.perfetto.dev). Disabled by default; `span()` is then a shared
+    no-op context manager so instrumented code pays almost nothing.
+
+    Optional extras:
+    - cpu: cProfile, merged into a single .prof on export. On Python 3.12+ one
+      process-wide profiler sees every thread (and a second one cannot be
+      enabled); older versions need one profiler per thread
+    - memory: tracemalloc, with a memory counter track in the trace and a
+      top-allocations report on export
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.cpu = False
+        self.memory = False
+        self._events: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self._pid = os.getpid()
+        self._profiles: List[cProfile.Profile] = []
+        self._process_profile: Optional[cProfile.Profile] = None
+        self._local = threading.local()
+
+    def enable(self, cpu: bool = False, memory: bool = False) -> None:
+        self.enabled = True
+        self.cpu = cpu
+        self.memory = memory
+        self._origin = time.perf_counter()
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start(25)
+        if cpu and sys.version_info >= (3, 12):
+            self._process_profile = self._start_profile()
+
+    def _start_profile(self) -> Optional[cProfile.Profile]:
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as e:
+            # Another profiler (ours or a debugger's) already owns the process
+            logger.warning(f"cProfile not started on {threading.current_thread().name}: {e}")
+            return None
+        with self._lock:
+            self._profiles.append(profile)
+        return profile
+
+    def _now_us(self) -> float:
+        return (time.perf_counter() - self._origin) * 1e6
+
+    def _emit(self, event: Dict[str, Any]) -> None:
+        with self._lock:
+            self._events.append(event)
+
+    def _name_thread(self) -> int:
+        tid = threading.get_ident()
+        if not getattr(self._local, "named", False):
+            self._local.named = True
+            self._emit({"ph": "M", "name": "thread_name", "pid": self._pid, "tid": tid,
+                        "args": {"name": threading.current_thread().name}})
+        return tid
+
+    def span(self, name: str, **args: Any):
+        """Times a block as a complete ('X') event on the current thread."""
+        if not self.enabled:
+            return _NOOP
+        return self._span(name, args)
+
+    @contextmanager
+    def _span(self, name: str, args: Dict[str, Any]):
+        tid = self._name_thread()
+        start = self._now_us()
+        try:
+            yield
+        finally:
+            end = self._now_us()
+            event = {"ph": "X", "name": name, "pid": self._pid, "tid": tid, "ts": start, "dur": end - start}
+            if args:
+                event["args"] = {k: str(v) for k, v in args.items()}
+            self._emit(event)
+            if self.memory and tracemalloc.is_tracing():
+                current, peak = tracemalloc.get_traced_memory()
+                self._emit({"ph": "C", "name": "python_heap", "pid": self._pid, "ts": end,
+                            "args": {"current_mb": round(current / 1e6, 3), "peak_mb": round(peak / 1e6, 3)}})
+
+    @contextmanager
+    def profile_thread(self):
+        """
+        Runs cProfile for the current thread while the block executes. No-op unless
+        cpu profiling is on, or when the process-wide profiler (3.12+) already covers it.
+        """
+        if not (self.enabled and self.cpu) or self._process_profile is not None:
+            yield
+            return
+        profile = self._start_profile()
+        try:
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+
+    def export(self, path: str, top: int = 20) -> None:
+        """Writes the trace JSON, plus <name>.prof and <name>_memory.txt when those modes are on."""
+        if not self.enabled:
+            return
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            events = list(self._events)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        logger.info(f"Profile trace written to {path} ({len(events)} events). Open it in https://ui.perfetto.dev")
+        base = os.path.splitext(path)[0]
+
+        if self._process_profile is not None:
+            self._process_profile.disable()
+            self._process_profile = None
+        if self._profiles:
+            stats = None
+            for profile in self._profiles:
+                if stats is None:
+                    stats = pstats.Stats(profile)
+                else:
+                    stats.add(profile)
+            stats.dump_stats(base + ".prof")
+            out = io.StringIO()
+            stats.stream = out
+            stats.sort_stats("cumulative").print_stats(top)
+            logger.info(f"cProfile stats written to {base}.prof. Hottest call sites:\n{out.getvalue()}")
+
+        if self.memory and tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot().filter_traces([
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, __file__),
+                tracemalloc.Filter(False, pstats.__file__),
+                tracemalloc.Filter(False, cProfile.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>")
+            ])
+            current, peak = tracemalloc.get_traced_memory()
+            lines = [f"Current: {current / 1e6:.2f} MB | Peak: {peak / 1e6:.2f} MB", "", f"Top {top} allocation sites:"]
+            for stat in snapshot.statistics("lineno")[:top]:
+                lines.append(str(stat))
+            report = "\n".join(lines)
+            with open(base + "_memory.txt", "w", encoding="utf-8") as f:
+                f.write(report + "\n")
+            logger.info(f"tracemalloc report written to {base}_memory.txt\n{report}")
+
+
+tracer = Tracer()
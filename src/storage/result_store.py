@@ -0,0 +1,248 @@
+import os
+import csv
+import json
+import heapq
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import List, Optional, Dict, Any, Iterator, Tuple
+from loguru import logger
+
+RESULT_FIELDS = [
+    "reasoning", "product_line", "origin_port_code", "origin_port_name",
+    "destination_port_code", "destination_port_name", "incoterm",
+    "cargo_weight_kg", "cargo_cbm", "is_dangerous"
+]
+
+EXPORT_COLUMNS = ["id", "created_at", "source", "run_id", "email_id", "subject", "sender_email"] + RESULT_FIELDS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT NOT NULL,
+    source TEXT NOT NULL,
+    run_id TEXT,
+    email_id TEXT NOT NULL,
+    subject TEXT,
+    sender_email TEXT,
+    body TEXT,
+    reasoning TEXT,
+    product_line TEXT,
+    origin_port_code TEXT,
+    origin_port_name TEXT,
+    destination_port_code TEXT,
+    destination_port_name TEXT,
+    incoterm TEXT,
+    cargo_weight_kg REAL,
+    cargo_cbm REAL,
+    is_dangerous INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_results_created_at ON results(created_at);
+-- Single-column indexes end in the implicit rowid, i.e. (col, id): filtered
+-- pages walk the index in id order instead of sorting every match
+CREATE INDEX IF NOT EXISTS idx_results_origin ON results(origin_port_code);
+CREATE INDEX IF NOT EXISTS idx_results_destination ON results(destination_port_code);
+CREATE INDEX IF NOT EXISTS idx_results_product_line ON results(product_line);
+CREATE INDEX IF NOT EXISTS idx_results_dg ON results(is_dangerous);
+CREATE INDEX IF NOT EXISTS idx_results_run ON results(run_id);
+CREATE INDEX IF NOT EXISTS idx_results_email ON results(email_id);
+"""
+
+
+def _utc_now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+class ResultStore:
+    """
+    Persistent, indexed store for extraction results (SQLite).
+    Shared by the batch pipeline (main.py) and the demo UI (app.py).
+
+    Timestamps are stored as UTC 'YYYY-MM-DD HH:MM:SS' strings so range filters
+    use the created_at indexes. History pages use keyset pagination (`before_id`)
+    so deep pages cost the same as the first one.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # ---- Writes ----
+
+    @staticmethod
+    def _row(result: Dict[str, Any], email: Optional[Dict[str, Any]], source: str, run_id: Optional[str], created_at: Optional[str]) -> Tuple:
+        email = email or {}
+        values = [result.get(f) for f in RESULT_FIELDS]
+        values[-1] = 1 if result.get("is_dangerous") else 0
+        return (
+            created_at or _utc_now(), source, run_id, result.get("id") or email.get("id") or "UNKN",
+            email.get("subject"), email.get("sender_email"), email.get("body"), *values
+        )
+
+    def add(self, result: Dict[str, Any], email: Optional[Dict[str, Any]] = None, source: str = "pipeline",
+            run_id: Optional[str] = None, created_at: Optional[str] = None) -> int:
+        """Inserts one result (an ExtractionResult.model_dump()) and returns its row id."""
+        row = self._row(result, email, source, run_id, created_at)
+        with self._lock, self._conn:
+            cur = self._conn.execute(self._insert_sql(), row)
+            return cur.lastrowid
+
+    def add_many(self, items: List[Tuple[Dict[str, Any], Optional[Dict[str, Any]]]], source: str = "import",
+                 run_id: Optional[str] = None) -> int:
+        """Bulk insert of (result, email) pairs in a single transaction."""
+        rows = [self._row(result, email, source, run_id, None) for result, email in items]
+        with self._lock, self._conn:
+            self._conn.executemany(self._insert_sql(), rows)
+        return len(rows)
+
+    @staticmethod
+    def _insert_sql() -> str:
+        columns = ["created_at", "source", "run_id", "email_id", "subject", "sender_email", "body"] + RESULT_FIELDS
+        return f"INSERT INTO results ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+
+    def clear(self, **filters: Any) -> int:
+        """Deletes matching rows (all rows if no filters). Returns the number deleted."""
+        where, params = self._where(filters)
+        with self._lock, self._conn:
+            return self._conn.execute(f"DELETE FROM results{where}", params).rowcount
+
+    # ---- Queries ----
+
+    @classmethod
+    def _branches(cls, filters: Dict[str, Any]) -> List[Tuple[str, List[Any]]]:
+        """
+        WHERE clauses whose results are unioned. `port` becomes two disjoint
+        branches (origin match / destination-only match) so each one walks a
+        single (col, id) index in id order instead of SQLite sorting an OR.
+        """
+        port = filters.get("port")
+        where, params = cls._where({k: v for k, v in filters.items() if k != "port"})
+        if not port:
+            return [(where, params)]
+        port = port.upper()
+        joiner = " AND " if where else " WHERE "
+        return [
+            (where + joiner + "origin_port_code = ?", params + [port]),
+            (where + joiner + "destination_port_code = ? AND origin_port_code IS NOT ?", params + [port, port]),
+        ]
+
+    @staticmethod
+    def _where(filters: Dict[str, Any]) -> Tuple[str, List[Any]]:
+        """
+        Supported filters: origin, destination, port (either side), product_line,
+        is_dangerous, since, until (inclusive 'YYYY-MM-DD[ HH:MM:SS]' UTC),
+        run_id, email_id, source.
+        """
+        clauses, params = [], []
+        for key, column in [("origin", "origin_port_code"), ("destination", "destination_port_code"),
+                            ("product_line", "product_line"), ("run_id", "run_id"),
+                            ("email_id", "email_id"), ("source", "source")]:
+            if filters.get(key):
+                clauses.append(f"{column} = ?")
+                params.append(filters[key].upper() if key in ("origin", "destination") else filters[key])
+        if filters.get("port"):
+            clauses.append("(origin_port_code = ? OR destination_port_code = ?)")
+            params += [filters["port"].upper()] * 2
+        if filters.get("is_dangerous") is not None:
+            clauses.append("is_dangerous = ?")
+            params.append(1 if filters["is_dangerous"] else 0)
+        if filters.get("since"):
+            clauses.append("created_at >= ?")
+            params.append(str(filters["since"]))
+        if filters.get("until"):
+            until = str(filters["until"])
+            # A bare date includes the whole day
+            clauses.append("created_at <= ?")
+            params.append(until + " 23:59:59" if len(until) == 10 else until)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def count(self, **filters: Any) -> int:
+        total = 0
+        with self._lock:
+            for where, params in self._branches(filters):
+                total += self._conn.execute(f"SELECT COUNT(*) FROM results{where}", params).fetchone()[0]
+        return total
+
+    def query(self, limit: int = 50, before_id: Optional[int] = None, **filters: Any) -> List[Dict[str, Any]]:
+        """Newest first. Pass the last row's `id` as `before_id` to fetch the next page."""
+        rows = []
+        for where, params in self._branches(filters):
+            if before_id is not None:
+                where += (" AND " if where else " WHERE ") + "id < ?"
+                params = params + [before_id]
+            sql = f"SELECT {', '.join(EXPORT_COLUMNS)} FROM results{where} ORDER BY id DESC LIMIT ?"
+            with self._lock:
+                rows += self._conn.execute(sql, params + [limit]).fetchall()
+        rows.sort(key=lambda r: r["id"], reverse=True)
+        return [self._to_dict(r) for r in rows[:limit]]
+
+    def iter_rows(self, batch_size: int = 5000, **filters: Any) -> Iterator[Dict[str, Any]]:
+        """Streams matching rows oldest first in keyset batches (constant memory)."""
+        branches = [self._iter_branch(where, params, batch_size) for where, params in self._branches(filters)]
+        if len(branches) == 1:
+            return branches[0]
+        return heapq.merge(*branches, key=lambda row: row["id"])
+
+    def _iter_branch(self, where: str, params: List[Any], batch_size: int) -> Iterator[Dict[str, Any]]:
+        last_id = 0
+        while True:
+            clause = where + (" AND " if where else " WHERE ") + "id > ?"
+            sql = f"SELECT {', '.join(EXPORT_COLUMNS)} FROM results{clause} ORDER BY id LIMIT ?"
+            with self._lock:
+                rows = self._conn.execute(sql, params + [last_id, batch_size]).fetchall()
+            if not rows:
+                return
+            for r in rows:
+                yield self._to_dict(r)
+            last_id = rows[-1]["id"]
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        data = dict(row)
+        data["is_dangerous"] = bool(data["is_dangerous"])
+        return data
+
+    @staticmethod
+    def as_result(row: Dict[str, Any]) -> Dict[str, Any]:
+        """Projects a stored row back to the ExtractionResult output shape."""
+        return {"id": row["email_id"], **{f: row[f] for f in RESULT_FIELDS}}
+
+    # ---- Export ----
+
+    def export(self, fh, fmt: str = "csv", **filters: Any) -> int:
+        """Streams matching rows to an open text file handle as CSV or a JSON array. Returns row count."""
+        n = 0
+        if fmt == "csv":
+            writer = csv.DictWriter(fh, fieldnames=EXPORT_COLUMNS)
+            writer.writeheader()
+            for row in self.iter_rows(**filters):
+                writer.writerow(row)
+                n += 1
+        elif fmt == "json":
+            fh.write("[")
+            for row in self.iter_rows(**filters):
+                fh.write(("," if n else "") + "\n  " + json.dumps(self.as_result(row)))
+                n += 1
+            fh.write("\n]\n" if n else "]\n")
+        else:
+            raise ValueError(f"Unsupported export format: {fmt}")
+        return n
+
+    def export_to_path(self, path: str, fmt: Optional[str] = None, **filters: Any) -> int:
+        fmt = fmt or ("json" if path.endswith(".json") else "csv")
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            n = self.export(f, fmt, **filters)
+        logger.info(f"Exported {n} results to {path}")
+        return n